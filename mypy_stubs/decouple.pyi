@@ -9,7 +9,7 @@ Changes:
 * Converted config from instance of callable AutoConfig to a function
 * Simplified interfaces of Csv and Choices to our usage
 """
-from collections.abc import Sequence
+from collections.abc import Iterator, Sequence
 from typing import Any, Callable, Generic, Optional, TypeVar, Union, overload
 
 # Unreleased as of 3.6 - accepts a bool
@@ -30,11 +30,28 @@ def config(
     option: str, default: _DefaultType, cast: Callable[[_DefaultType], _CastReturnType]
 ) -> _CastReturnType: ...
 
-class Csv:
+_CsvItemType = TypeVar("_CsvItemType")
+_CsvReturnType = TypeVar("_CsvReturnType")
+
+class Csv(Generic[_CsvReturnType]):
     # Note: there are additional parameters that Relay (currently) doesn't use:
-    # cast, delimiter, strip, post_process
-    def __init__(self) -> None: ...
-    def __call__(self, value: str) -> list[str]: ...
+    # delimiter, strip
+    @overload
+    def __init__(self: Csv[list[str]]) -> None: ...
+    @overload
+    def __init__(
+        self: Csv[_CsvReturnType],
+        *,
+        post_process: Callable[[Iterator[str]], _CsvReturnType],
+    ) -> None: ...
+    @overload
+    def __init__(
+        self: Csv[_CsvReturnType],
+        cast: Callable[[str], _CsvItemType],
+        *,
+        post_process: Callable[[Iterator[_CsvItemType]], _CsvReturnType],
+    ) -> None: ...
+    def __call__(self, value: str) -> _CsvReturnType: ...
 
 class Choices(Generic[_CastReturnType]):
     # Note: there are additional parameters that Relay (currently) doesn't use:
@@ -0,0 +1,125 @@
+"""
+Content Security Policy (CSP) hashes for the styles generated by Next.js
+
+Next.js injects its stylesheets as inline styles when switching pages, so in
+production we allow them in CSP_STYLE_SRC by hash. Hashing means reading every
+stylesheet, so ./manage.py collectstatic records the hashes in a manifest in
+STATIC_ROOT, and settings.py loads the manifest at startup. If the manifest is
+missing or the stylesheets on disk do not match it, the hashes are computed
+again in memory.
+
+This is imported by settings.py, so it can not depend on Django.
+"""
+
+from __future__ import annotations
+
+from hashlib import sha256
+from pathlib import Path
+from typing import TypedDict, TypeGuard
+import base64
+import json
+import os
+
+NEXT_CSS_DIR = Path("_next", "static", "css")
+MANIFEST_NAME = "_next_css_hashes.json"
+_READ_SIZE = 256 * 1024  # Hash in chunks, rather than reading whole files
+
+
+class CSSHashEntry(TypedDict):
+    size: int  # File size in bytes
+    hash: str  # Base64-encoded sha256 digest
+
+
+CSSHashManifest = dict[str, CSSHashEntry]
+
+
+def hash_file(path: str | Path) -> str:
+    """Return the base64-encoded sha256 digest of a file's contents."""
+    # Use sha256 hashes, to keep in sync with Chrome.
+    # When CSP rules fail in Chrome, it provides the sha256 hash that would
+    # have matched, useful for debugging.
+    digest = sha256()
+    with open(path, "rb") as css_file:
+        while chunk := css_file.read(_READ_SIZE):
+            digest.update(chunk)
+    return base64.b64encode(digest.digest()).decode()
+
+
+def _scan_stylesheets(static_root: str | Path) -> list[os.DirEntry[str]]:
+    """Return the directory entries of the Next.js stylesheets."""
+    try:
+        with os.scandir(Path(static_root) / NEXT_CSS_DIR) as entries:
+            return [
+                entry
+                for entry in entries
+                if entry.name.endswith(".css") and entry.is_file()
+            ]
+    except FileNotFoundError:
+        return []
+
+
+def build_manifest(static_root: str | Path) -> CSSHashManifest:
+    """Hash the Next.js stylesheets in the static root."""
+    manifest: CSSHashManifest = {}
+    for entry in _scan_stylesheets(static_root):
+        manifest[entry.name] = {
+            "size": entry.stat().st_size,
+            "hash": hash_file(entry.path),
+        }
+    return manifest
+
+
+def write_manifest(static_root: str | Path, manifest: CSSHashManifest) -> None:
+    """Write the manifest, replacing it atomically for concurrent readers."""
+    path = Path(static_root) / MANIFEST_NAME
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp_path, path)
+
+
+def _manifest_is_current(
+    manifest: object, static_root: str | Path
+) -> TypeGuard[CSSHashManifest]:
+    """
+    Return True if the manifest is well-formed and matches the Next.js
+    stylesheets on disk.
+
+    Next.js puts a content hash in each stylesheet's file name, so the names
+    and sizes are compared. Modification times are not, since they do not
+    survive the trip from the Docker build into the image unchanged.
+    """
+    if not isinstance(manifest, dict):
+        return False
+    dir_entries = _scan_stylesheets(static_root)
+    if {dir_entry.name for dir_entry in dir_entries} != manifest.keys():
+        return False
+    for dir_entry in dir_entries:
+        entry = manifest[dir_entry.name]
+        if not (
+            isinstance(entry, dict)
+            and isinstance(entry.get("hash"), str)
+            and entry.get("size") == dir_entry.stat().st_size
+        ):
+            return False
+    return True
+
+
+def load_next_css_hashes(static_root: str | Path) -> list[str]:
+    """
+    Return the sorted CSP source values for the Next.js stylesheets.
+
+    The manifest written by collectstatic is used if it is current. If not,
+    the stylesheets are hashed again, without writing to the static root.
+    """
+    loaded: object
+    try:
+        loaded = json.loads((Path(static_root) / MANIFEST_NAME).read_text())
+    except (OSError, ValueError):
+        loaded = None
+
+    if _manifest_is_current(loaded, static_root):
+        manifest = loaded
+    else:
+        manifest = build_manifest(static_root)
+
+    return sorted(f"'sha256-{entry['hash']}'" for entry in manifest.values())
@@ -11,7 +11,6 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 from __future__ import annotations
-from pathlib import Path
 from typing import Any, Optional, TYPE_CHECKING
 import ipaddress
 import os
@@ -31,6 +30,8 @@ from django.conf.global_settings import LANGUAGES as DEFAULT_LANGUAGES
 
 import dj_database_url
 
+from privaterelay.csp_hashes import load_next_css_hashes
+
 if TYPE_CHECKING:
     import wsgiref.headers
 
@@ -85,6 +86,9 @@ SECURE_HSTS_SECONDS = config("DJANGO_SECURE_HSTS_SECONDS", None)
 SECURE_BROWSER_XSS_FILTER = config("DJANGO_SECURE_BROWSER_XSS_FILTER", True)
 SESSION_COOKIE_SECURE = config("DJANGO_SESSION_COOKIE_SECURE", False, cast=bool)
 BASKET_ORIGIN = config("BASKET_ORIGIN", "https://basket.mozilla.org")
+FXA_PROFILE_ENDPOINT = config(
+    "FXA_PROFILE_ENDPOINT", "https://profile.accounts.firefox.com/v1"
+)
 # maps fxa profile hosts to respective avatar hosts for CSP
 AVATAR_IMG_SRC_MAP = {
     "https://profile.stage.mozaws.net/v1": [
@@ -96,9 +100,7 @@ AVATAR_IMG_SRC_MAP = {
         "https://profile.accounts.firefox.com",
     ],
 }
-AVATAR_IMG_SRC = AVATAR_IMG_SRC_MAP[
-    config("FXA_PROFILE_ENDPOINT", "https://profile.accounts.firefox.com/v1")
-]
+AVATAR_IMG_SRC = AVATAR_IMG_SRC_MAP[FXA_PROFILE_ENDPOINT]
 CSP_CONNECT_SRC = (
     "'self'",
     "https://www.google-analytics.com/",
@@ -132,17 +134,8 @@ else:
     # When running in production, we want to disallow inline styles that are
     # not set by us, so we use an explicit allowlist with the hashes of the
     # styles generated by Next.js.
-    _next_css_path = Path(STATIC_ROOT) / "_next" / "static" / "css"
-    hashes = []
-    for path in _next_css_path.glob("*.css"):
-        # Use sha256 hashes, to keep in sync with Chrome.
-        # When CSP rules fail in Chrome, it provides the sha256 hash that would
-        # have matched, useful for debugging.
-        content = open(path, "rb").read()
-        the_hash = base64.b64encode(sha256(content).digest()).decode()
-        hashes.append(f"'sha256-{the_hash}'")
-    hashes.sort()
-    csp_style_values.extend(hashes)
+    # The hashes are recorded by collectstatic, see privaterelay/csp_hashes.py
+    csp_style_values.extend(load_next_css_hashes(STATIC_ROOT))
 
     # Add the hash for an empty string (sha256-47DEQp...)
     # next,js injects an empty style element and then adds the content.
@@ -154,7 +147,7 @@ else:
 CSP_STYLE_SRC = tuple(csp_style_values)
 
 CSP_IMG_SRC = ["'self'"] + AVATAR_IMG_SRC
-REFERRER_POLICY = "strict-origin-when-cross-origin"
+SECURE_REFERRER_POLICY = "same-origin"
 
 ALLOWED_HOSTS = []
 DJANGO_ALLOWED_HOSTS = config("DJANGO_ALLOWED_HOST", "", cast=Csv())
@@ -172,7 +165,7 @@ ADMIN_ENABLED = config("ADMIN_ENABLED", False, cast=bool)
 AWS_REGION: str | None = config("AWS_REGION", None)
 AWS_ACCESS_KEY_ID = config("AWS_ACCESS_KEY_ID", None)
 AWS_SECRET_ACCESS_KEY = config("AWS_SECRET_ACCESS_KEY", None)
-AWS_SNS_TOPIC = set(config("AWS_SNS_TOPIC", "", cast=Csv()))
+AWS_SNS_TOPIC = config("AWS_SNS_TOPIC", "", cast=Csv(post_process=frozenset))
 AWS_SNS_KEY_CACHE = config("AWS_SNS_KEY_CACHE", "default")
 AWS_SES_CONFIGSET = config("AWS_SES_CONFIGSET", None)
 AWS_SQS_EMAIL_QUEUE_URL = config("AWS_SQS_EMAIL_QUEUE_URL", None)
@@ -198,8 +191,10 @@ TWILIO_SMS_APPLICATION_SID = config("TWILIO_SMS_APPLICATION_SID", None)
 TWILIO_MESSAGING_SERVICE_SID = config("TWILIO_MESSAGING_SERVICE_SID", "", cast=Csv())
 TWILIO_TEST_ACCOUNT_SID = config("TWILIO_TEST_ACCOUNT_SID", None)
 TWILIO_TEST_AUTH_TOKEN = config("TWILIO_TEST_AUTH_TOKEN", None)
-TWILIO_ALLOWED_COUNTRY_CODES = set(
-    code.upper() for code in config("TWILIO_ALLOWED_COUNTRY_CODES", "US,CA", cast=Csv())
+TWILIO_ALLOWED_COUNTRY_CODES = config(
+    "TWILIO_ALLOWED_COUNTRY_CODES",
+    "US,CA",
+    cast=Csv(cast=str.upper, post_process=frozenset),
 )
 MAX_MINUTES_TO_VERIFY_REAL_PHONE = config(
     "MAX_MINUTES_TO_VERIFY_REAL_PHONE", 5, cast=int
@@ -224,7 +219,7 @@ DJANGO_STATSD_ENABLED = config("DJANGO_STATSD_ENABLED", False, cast=bool)
 STATSD_DEBUG = config("STATSD_DEBUG", False, cast=bool)
 STATSD_ENABLED = DJANGO_STATSD_ENABLED or STATSD_DEBUG
 STATSD_HOST = config("DJANGO_STATSD_HOST", "127.0.0.1")
-STATSD_PORT = config("DJANGO_STATSD_PORT", "8125")
+STATSD_PORT = config("DJANGO_STATSD_PORT", 8125, cast=int)
 STATSD_PREFIX = config("DJANGO_STATSD_PREFIX", "fx.private.relay")
 
 SERVE_ADDON = config("SERVE_ADDON", None)
@@ -328,7 +323,6 @@ MIDDLEWARE += [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django.middleware.locale.LocaleMiddleware",
     "django_ftl.middleware.activate_from_request_language_code",
-    "django_referrer_policy.middleware.ReferrerPolicyMiddleware",
     "dockerflow.django.middleware.DockerflowMiddleware",
     "waffle.middleware.WaffleMiddleware",
     "privaterelay.middleware.AddDetectedCountryToRequestAndResponseHeaders",
@@ -404,7 +398,10 @@ WSGI_APPLICATION = "privaterelay.wsgi.application"
 
 DATABASES = {
     "default": dj_database_url.config(
-        default="sqlite:///%s" % os.path.join(BASE_DIR, "db.sqlite3")
+        default="sqlite:///%s" % os.path.join(BASE_DIR, "db.sqlite3"),
+        # Reuse connections across requests, checking them before reuse
+        conn_max_age=config("DJANGO_CONN_MAX_AGE", 60, cast=int),
+        conn_health_checks=True,
     )
 }
 
@@ -461,8 +458,6 @@ TIME_ZONE = "UTC"
 
 USE_I18N = True
 
-USE_L10N = True
-
 USE_TZ = True
 
 STATICFILES_DIRS = [
@@ -511,17 +506,16 @@ AUTHENTICATION_BACKENDS = (
     "allauth.account.auth_backends.AuthenticationBackend",
 )
 
+FXA_OAUTH_ENDPOINT = config(
+    "FXA_OAUTH_ENDPOINT", "https://oauth.accounts.firefox.com/v1"
+)
 SOCIALACCOUNT_PROVIDERS = {
     "fxa": {
         # Note: to request "profile" scope, must be a trusted Mozilla client
         "SCOPE": ["profile", "https://identity.mozilla.com/account/subscriptions"],
         "AUTH_PARAMS": {"access_type": "offline"},
-        "OAUTH_ENDPOINT": config(
-            "FXA_OAUTH_ENDPOINT", "https://oauth.accounts.firefox.com/v1"
-        ),
-        "PROFILE_ENDPOINT": config(
-            "FXA_PROFILE_ENDPOINT", "https://profile.accounts.firefox.com/v1"
-        ),
+        "OAUTH_ENDPOINT": FXA_OAUTH_ENDPOINT,
+        "PROFILE_ENDPOINT": FXA_PROFILE_ENDPOINT,
         "VERIFIED_EMAIL": True,  # Assume FxA primary email is verified
     }
 }
@@ -3,10 +3,12 @@ Staticfiles storage implementation for Relay.
 
 This is used when running ./manage.py collectstatic, or rendering Django templates.
 """
-from typing import Any
+from typing import Any, Iterator
 
 from whitenoise.storage import CompressedManifestStaticFilesStorage
 
+from .csp_hashes import build_manifest, write_manifest
+
 
 class RelayStaticFilesStorage(CompressedManifestStaticFilesStorage):
     """
@@ -21,7 +23,7 @@ class RelayStaticFilesStorage(CompressedManifestStaticFilesStorage):
     pre-compressing files as well, so that the gzipped versions can be served.
 
     This class skips renaming files from Next.js, which already include hashes
-    in the filenames.
+    in the filenames, and records the CSP hashes of the Next.js stylesheets.
 
     See:
     https://docs.djangoproject.com/en/4.2/ref/contrib/staticfiles/#manifeststaticfilesstorage
@@ -56,3 +58,14 @@ class RelayStaticFilesStorage(CompressedManifestStaticFilesStorage):
             path = name.rsplit("/", 1)[0]
             template = f"/*# sourceMappingURL={self.base_url}{path}/%(url)s */"
         return super().url_converter(name, hashed_files, template)
+
+    def post_process(self, *args: Any, **kwargs: Any) -> Iterator[Any]:
+        """
+        Record the CSP hashes of the Next.js stylesheets.
+
+        This runs after the parent post-processing, which can rewrite the
+        sourceMappingURL in the stylesheets. See privaterelay/csp_hashes.py.
+        """
+        yield from super().post_process(*args, **kwargs)
+        if not kwargs.get("dry_run", False):
+            write_manifest(self.location, build_manifest(self.location))
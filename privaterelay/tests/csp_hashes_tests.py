@@ -0,0 +1,140 @@
+"""Tests for privaterelay/csp_hashes.py"""
+from hashlib import sha256
+from pathlib import Path
+import base64
+import json
+import os
+
+import pytest
+
+from ..csp_hashes import (
+    MANIFEST_NAME,
+    NEXT_CSS_DIR,
+    build_manifest,
+    hash_file,
+    load_next_css_hashes,
+    write_manifest,
+)
+from ..storage import RelayStaticFilesStorage
+
+
+def _csp_hash(content: bytes) -> str:
+    return "'sha256-" + base64.b64encode(sha256(content).digest()).decode() + "'"
+
+
+@pytest.fixture
+def static_root(tmp_path: Path) -> Path:
+    """A static root with two Next.js stylesheets"""
+    css_dir = tmp_path / NEXT_CSS_DIR
+    css_dir.mkdir(parents=True)
+    (css_dir / "one.css").write_bytes(b"body{color:red}")
+    (css_dir / "two.css").write_bytes(b"p{margin:0}")
+    (css_dir / "two.css.gz").write_bytes(b"not a stylesheet")
+    return tmp_path
+
+
+def test_build_manifest(static_root: Path) -> None:
+    manifest = build_manifest(static_root)
+    assert sorted(manifest.keys()) == ["one.css", "two.css"]
+    one = manifest["one.css"]
+    assert one["size"] == len(b"body{color:red}")
+    assert f"'sha256-{one['hash']}'" == _csp_hash(b"body{color:red}")
+
+
+def test_hash_file_larger_than_read_size(tmp_path: Path) -> None:
+    content = b"a{b:c}" * 100_000
+    path = tmp_path / "big.css"
+    path.write_bytes(content)
+    assert f"'sha256-{hash_file(path)}'" == _csp_hash(content)
+
+
+def test_load_next_css_hashes_without_manifest(static_root: Path) -> None:
+    hashes = load_next_css_hashes(static_root)
+    assert hashes == sorted([_csp_hash(b"body{color:red}"), _csp_hash(b"p{margin:0}")])
+    assert not (static_root / MANIFEST_NAME).exists()
+
+
+def test_load_next_css_hashes_uses_current_manifest(static_root: Path) -> None:
+    manifest = build_manifest(static_root)
+    manifest["one.css"]["hash"] = "from-manifest"
+    write_manifest(static_root, manifest)
+
+    hashes = load_next_css_hashes(static_root)
+    assert "'sha256-from-manifest'" in hashes
+
+
+def test_load_next_css_hashes_ignores_stale_manifest(static_root: Path) -> None:
+    manifest = build_manifest(static_root)
+    manifest["one.css"]["hash"] = "from-manifest"
+    write_manifest(static_root, manifest)
+    (static_root / NEXT_CSS_DIR / "one.css").write_bytes(b"body{color:blue}")
+
+    hashes = load_next_css_hashes(static_root)
+    assert "'sha256-from-manifest'" not in hashes
+    assert _csp_hash(b"body{color:blue}") in hashes
+    new_manifest = json.loads((static_root / MANIFEST_NAME).read_text())
+    assert new_manifest == manifest
+
+
+def test_load_next_css_hashes_ignores_mtime_changes(static_root: Path) -> None:
+    manifest = build_manifest(static_root)
+    manifest["one.css"]["hash"] = "from-manifest"
+    write_manifest(static_root, manifest)
+    css_path = static_root / NEXT_CSS_DIR / "one.css"
+    stat = css_path.stat()
+    # Docker image layers can truncate modification times to the second
+    os.utime(css_path, ns=(stat.st_atime_ns, stat.st_mtime_ns - 500_000_000))
+
+    hashes = load_next_css_hashes(static_root)
+    assert "'sha256-from-manifest'" in hashes
+
+
+def test_load_next_css_hashes_ignores_manifest_with_removed_file(
+    static_root: Path,
+) -> None:
+    write_manifest(static_root, build_manifest(static_root))
+    (static_root / NEXT_CSS_DIR / "two.css").unlink()
+
+    hashes = load_next_css_hashes(static_root)
+    assert hashes == [_csp_hash(b"body{color:red}")]
+
+
+def test_load_next_css_hashes_ignores_invalid_manifest(static_root: Path) -> None:
+    (static_root / MANIFEST_NAME).write_text("not JSON")
+    assert len(load_next_css_hashes(static_root)) == 2
+
+
+@pytest.mark.parametrize(
+    "content",
+    (
+        [],
+        {"one.css": {}, "two.css": {}},
+        {"one.css": 1, "two.css": 2},
+        {"one.css": {"size": 15}, "two.css": {"size": 11}},
+    ),
+    ids=("list", "empty entries", "int entries", "entries without hash"),
+)
+def test_load_next_css_hashes_ignores_malformed_manifest(
+    static_root: Path, content: object
+) -> None:
+    (static_root / MANIFEST_NAME).write_text(json.dumps(content))
+    hashes = load_next_css_hashes(static_root)
+    assert hashes == sorted([_csp_hash(b"body{color:red}"), _csp_hash(b"p{margin:0}")])
+
+
+def test_load_next_css_hashes_no_stylesheets(tmp_path: Path) -> None:
+    assert load_next_css_hashes(tmp_path) == []
+    assert not (tmp_path / MANIFEST_NAME).exists()
+
+
+def test_storage_post_process_writes_manifest(static_root: Path) -> None:
+    storage = RelayStaticFilesStorage(location=str(static_root))
+    list(storage.post_process({}))
+    manifest = json.loads((static_root / MANIFEST_NAME).read_text())
+    assert manifest == build_manifest(static_root)
+
+
+def test_storage_post_process_dry_run_skips_manifest(static_root: Path) -> None:
+    storage = RelayStaticFilesStorage(location=str(static_root))
+    list(storage.post_process({}, dry_run=True))
+    assert not (static_root / MANIFEST_NAME).exists()
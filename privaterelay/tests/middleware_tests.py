@@ -0,0 +1,28 @@
+"""Tests for the middleware stack in privaterelay/settings.py"""
+from pathlib import Path
+
+from django.test import Client
+
+import pytest
+from pytest_django.fixtures import SettingsWrapper
+
+
+@pytest.fixture
+def frontend_root(tmp_path: Path, settings: SettingsWrapper) -> Path:
+    """Serve a Next.js-style index.html from the root with WhiteNoise"""
+    (tmp_path / "index.html").write_text("<html></html>")
+    settings.WHITENOISE_ROOT = str(tmp_path)
+    return tmp_path
+
+
+def test_referrer_policy_on_frontend_page(frontend_root: Path) -> None:
+    response = Client().get("/")
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/html")
+    assert response["Referrer-Policy"] == "same-origin"
+
+
+def test_referrer_policy_on_django_view() -> None:
+    response = Client().get("/__lbheartbeat__")
+    assert response.status_code == 200
+    assert response["Referrer-Policy"] == "same-origin"